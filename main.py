@@ -1,13 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timezone
-import random
+from itertools import repeat
+import json
+import threading
+import time
+import numpy as np
 
 app = FastAPI(
     title="Mock Drone Sensor Systems",
     description="Mock APIs for Drone Detection Systems A & B",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 
@@ -15,16 +21,63 @@ app = FastAPI(
 # Utility
 # ------------------------
 
+_UTC = timezone.utc
+
+
 def now_epoch() -> int:
-    return int(datetime.now(tz=timezone.utc).timestamp())
+    return int(time.time())
 
 
 def now_iso() -> str:
-    return datetime.now(tz=timezone.utc).isoformat()
+    return datetime.now(tz=_UTC).isoformat()
+
+
+def id_suffix(drone_id: str, now: datetime):
+    """Time-based suffix for drones whose id should keep changing, else None."""
+    if drone_id == 'DRN-4':
+        return now.second % 7
+
+    if drone_id == 'DRN-5':
+        return now.minute % 5
+
+    return None
+
+
+class JitterPool:
+    """Preallocated buffer of uniform [-1, 1) draws, refilled in large batches."""
+
+    def __init__(self, size: int = 4096):
+        self._rng = np.random.default_rng()
+        self._buf = np.empty(size, dtype=np.float64)
+        self._i = size
 
+    def draw(self, n: int) -> np.ndarray:
+        if self._i + n > self._buf.size:
+            self._rng.random(out=self._buf)
+            self._buf *= 2
+            self._buf -= 1
+            self._i = 0
 
-def jitter(value: float, delta: float = 0.0005) -> float:
-    return value + random.uniform(-delta, delta)
+        start = self._i
+        self._i += n
+        return self._buf[start:self._i]
+
+
+# The endpoints are async and share the event loop thread, but each thread gets
+# its own pool so sync callers on FastAPI's threadpool stay safe too.
+_pools = threading.local()
+
+
+def jitter_pool() -> JitterPool:
+    pool = getattr(_pools, "pool", None)
+    if pool is None:
+        pool = _pools.pool = JitterPool()
+    return pool
+
+
+def jitter(values: np.ndarray, delta: float = 0.0005) -> list:
+    """Jitter a whole column of base values in one vectorized add."""
+    return (values + delta * jitter_pool().draw(values.size)).tolist()
 
 
 # ------------------------
@@ -74,10 +127,105 @@ BASE_DRONES = [
     }
 ]
 
+N = len(BASE_DRONES)
+
+# Coordinates are kept as parallel arrays so each request jitters a whole
+# column at once instead of looking values up drone by drone.
+LATS = np.array([d["lat"] for d in BASE_DRONES], dtype=np.float64)
+LONS = np.array([d["lon"] for d in BASE_DRONES], dtype=np.float64)
+ALTS = np.array([d["alt"] for d in BASE_DRONES], dtype=np.float64)
+
+# Static per-drone fields are constant across requests, so they are built once
+# here and the endpoints only inject the dynamic id suffix, timestamp and jitter.
+DRONE_IDS = tuple(d["id"] for d in BASE_DRONES)
+DRONE_MODELS = tuple(d["model"] for d in BASE_DRONES)
+DRONE_MODELS_SHORT = tuple(d["model"].split()[-1] for d in BASE_DRONES)
+DRONE_MANUFACTURERS = tuple(d["manufacturer"] for d in BASE_DRONES)
+
+
+# ------------------------
+# Response templates
+# ------------------------
+# Everything but the timestamp, the jittered coordinates and the id suffixes is
+# constant, so each response body is pre-serialized once into a %-format bytes
+# template and requests only format the dynamic values into it.
+
+def _json_str(value: str) -> str:
+    return json.dumps(value).replace("%", "%%")
+
+
+def _json_id(drone_id: str) -> str:
+    if id_suffix(drone_id, datetime.now()) is None:
+        return _json_str(drone_id)
+    return _json_str(drone_id)[:-1] + '%d"'
+
+
+TEMPLATE_A = ("[" + ",".join(
+    '{"Drone_id":' + _json_id(drone_id) +
+    ',"Timestamp":%d,"Location_lat":%.6f,"Location_lon":%.6f,"Locatin_alt":%.6f'
+    ',"Drone_model":' + _json_str(model) + '}'
+    for drone_id, model in zip(DRONE_IDS, DRONE_MODELS)
+) + "]").encode()
+
+TEMPLATE_B = ("[" + ",".join(
+    '{"Serial":' + _json_id(drone_id) +
+    ',"Detection_timestamp":"%b","Location":{"type":"Point","coordinates":[%.6f,%.6f,%.6f]}'
+    ',"Model":' + _json_str(model) +
+    ',"manufacturer":' + _json_str(manufacturer) + '}'
+    for drone_id, model, manufacturer in zip(DRONE_IDS, DRONE_MODELS_SHORT, DRONE_MANUFACTURERS)
+) + "]").encode()
+
+
+def render_system_a(now: datetime, ts: int, lats: list, lons: list, alts: list) -> bytes:
+    suffixes = [id_suffix(drone_id, now) for drone_id in DRONE_IDS]
+    # Only ids with a time-based suffix have a placeholder, so None is skipped.
+    return TEMPLATE_A % tuple([
+        value
+        for row in zip(suffixes, repeat(ts), lats, lons, alts)
+        for value in row
+        if value is not None
+    ])
+
+
+def render_system_b(now: datetime, ts: bytes, lats: list, lons: list, alts: list) -> bytes:
+    suffixes = [id_suffix(drone_id, now) for drone_id in DRONE_IDS]
+    return TEMPLATE_B % tuple([
+        value
+        for row in zip(suffixes, repeat(ts), lons, lats, alts)
+        for value in row
+        if value is not None
+    ])
+
+
+# ------------------------
+# Response cache
+# ------------------------
+# Rendered bodies are reused for CACHE_TTL seconds, so clients polling faster
+# than that may see the same timestamp and positions twice. Pass ?fresh=1 to
+# bypass the cache.
+
+CACHE_TTL = 0.05
+
+_cache = {}
+
+
+def cache_get(key: str):
+    entry = _cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def cache_put(key: str, body: bytes) -> bytes:
+    _cache[key] = (time.monotonic(), body)
+    return body
+
 
 # ------------------------
 # System A schema
 # ------------------------
+# The schemas below describe the responses in the OpenAPI docs only; the
+# endpoints render the response templates and never instantiate these models.
 
 class SystemAResponse(BaseModel):
     Drone_id: str = Field(description='Serial number of the detected drone - With prefix "A-"')
@@ -88,6 +236,8 @@ class SystemAResponse(BaseModel):
     Drone_model: str = Field(description='The model of the drone')
 
     model_config = {
+        "frozen": True,
+        "extra": "ignore",
         "json_schema_extra": {
             "example": {
                 "Drone_id": "A-DRN-5",
@@ -99,15 +249,18 @@ class SystemAResponse(BaseModel):
             }
         }
     }
-    # ------------------------
-    # System B schema
-    # ------------------------
 
 
+# ------------------------
+# System B schema
+# ------------------------
+
 class GeoJSONPoint(BaseModel):
     type: str = "Point"
     coordinates: List[float]  # [lon, lat, alt]
 
+    model_config = {"frozen": True, "extra": "ignore"}
+
 
 class SystemBResponse(BaseModel):
     Serial: str = Field(description='Serial number of the detected drone - With prefix "SN-"')
@@ -117,6 +270,8 @@ class SystemBResponse(BaseModel):
     manufacturer: str = Field(description='The Manufacturer of the drone')
 
     model_config = {
+        "frozen": True,
+        "extra": "ignore",
         "json_schema_extra": {
             "example": {"Serial": "SN-DRN-1",
                         "Detection_timestamp": "2026-01-19T15:56:05.049630+00:00",
@@ -134,12 +289,20 @@ class SystemBResponse(BaseModel):
     }
 
 
+class DetectionsResponse(BaseModel):
+    a: Optional[List[SystemAResponse]] = Field(default=None, description='System A detections')
+    b: Optional[List[SystemBResponse]] = Field(default=None, description='System B detections')
+
+
 # ------------------------
 # Endpoints
 # ------------------------
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get(
@@ -147,32 +310,23 @@ def health():
     response_model=List[SystemAResponse],
     summary="System A – Drone detections"
 )
-def get_system_a_detections():
+async def get_system_a_detections(fresh: bool = False):
     """
     Simulates detections from System A.
     Timestamp and location change on every request.
     """
-    responses = []
-
-    for drone in BASE_DRONES:
-        drone_to_return = {**drone}
+    body = None if fresh else cache_get("a")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
 
-        if drone_to_return['id'] == 'DRN-4':
-            drone_to_return['id'] += str(datetime.now().second % 7)
+    # All drones in one response share the same detection moment.
+    now = datetime.now()
+    ts = now_epoch()
+    body = cache_put("a", render_system_a(now, ts, jitter(LATS), jitter(LONS), jitter(ALTS, delta=5)))
 
-        if drone_to_return['id'] == 'DRN-5':
-            drone_to_return['id'] += str(datetime.now().minute % 5)
-
-        responses.append(SystemAResponse(
-            Drone_id=f"{drone_to_return['id']}",
-            Timestamp=now_epoch(),
-            Location_lat=jitter(drone_to_return["lat"]),
-            Location_lon=jitter(drone_to_return["lon"]),
-            Locatin_alt=drone_to_return["alt"] + random.uniform(-5, 5),
-            Drone_model=drone_to_return["model"]
-        ))
-
-    return responses
+    # Returning the response directly skips FastAPI's jsonable_encoder and
+    # response_model validation; response_model is kept for the OpenAPI docs.
+    return Response(content=body, media_type="application/json")
 
 
 @app.get(
@@ -180,32 +334,54 @@ def get_system_a_detections():
     response_model=List[SystemBResponse],
     summary="System B – Drone detections"
 )
-def get_system_b_detections():
+async def get_system_b_detections(fresh: bool = False):
     """
     Simulates detections from System B using GeoJSON and ISO timestamps.
     """
-    responses = []
-
-    for drone in BASE_DRONES:
-        drone_to_return = {**drone}
-        if drone_to_return['id'] == 'DRN-4':
-            drone_to_return['id'] += str(datetime.now().second % 7)
-
-        if drone_to_return['id'] == 'DRN-5':
-            drone_to_return['id'] += str(datetime.now().minute % 5)
-
-        responses.append(SystemBResponse(
-            Serial=f"{drone_to_return['id']}",
-            Detection_timestamp=now_iso(),
-            Location=GeoJSONPoint(
-                coordinates=[
-                    jitter(drone_to_return["lon"]),
-                    jitter(drone_to_return["lat"]),
-                    drone_to_return["alt"] + random.uniform(-5, 5)
-                ]
-            ),
-            Model=drone_to_return["model"].split()[-1],
-            manufacturer=drone_to_return["manufacturer"]
-        ))
-
-    return responses
+    body = None if fresh else cache_get("b")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    # All drones in one response share the same detection moment.
+    now = datetime.now()
+    ts = now_iso().encode()
+    body = cache_put("b", render_system_b(now, ts, jitter(LATS), jitter(LONS), jitter(ALTS, delta=5)))
+
+    return Response(content=body, media_type="application/json")
+
+
+@app.get(
+    "/detections",
+    response_model=DetectionsResponse,
+    summary="Systems A & B – Drone detections in one call"
+)
+async def get_detections(systems: str = "a,b", fresh: bool = False):
+    """
+    Returns detections from several systems in one response, keyed by system.
+    Both systems share the same detection moment and jitter.
+    """
+    requested = {system.strip() for system in systems.split(",")}
+    unknown = requested - {"a", "b"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown systems: {', '.join(sorted(unknown))}")
+
+    key = "detections:" + ",".join(sorted(requested))
+    body = None if fresh else cache_get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    moment = datetime.now(tz=_UTC)
+    lats = jitter(LATS)
+    lons = jitter(LONS)
+    alts = jitter(ALTS, delta=5)
+    parts = []
+
+    if "a" in requested:
+        parts.append(b'"a":' + render_system_a(moment, int(moment.timestamp()), lats, lons, alts))
+
+    if "b" in requested:
+        parts.append(b'"b":' + render_system_b(moment, moment.isoformat().encode(), lats, lons, alts))
+
+    body = cache_put(key, b"{" + b",".join(parts) + b"}")
+
+    return Response(content=body, media_type="application/json")